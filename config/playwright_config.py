@@ -38,13 +38,26 @@ VIEWPORT_CONFIG = {
     'height': int(os.getenv('VIEWPORT_HEIGHT', '1080'))
 }
 
+# 视频录制分辨率，格式为 "宽x高"；低于视口时画面按比例缩放，可显著减小视频体积和编码开销
+def _parse_video_size(value: str) -> Dict[str, int]:
+    """解析 "宽x高" 格式的视频分辨率"""
+    try:
+        width, height = (int(part) for part in value.lower().split('x'))
+    except ValueError:
+        width = height = 0
+    if width <= 0 or height <= 0:
+        raise ValueError(f"环境变量 VIDEO_SIZE 格式无效: {value!r}，应为 \"宽x高\"，如 1280x720")
+    return {'width': width, 'height': height}
+
+VIDEO_SIZE_CONFIG = _parse_video_size(os.getenv('VIDEO_SIZE', '1280x720'))
+
 CONTEXT_CONFIG = {
     'viewport': VIEWPORT_CONFIG,
     'ignore_https_errors': True,
     'java_script_enabled': True,
     'accept_downloads': True,
     'record_video_dir': 'reports/videos' if os.getenv('RECORD_VIDEO', 'true').lower() == 'true' else None,
-    'record_video_size': VIEWPORT_CONFIG,
+    'record_video_size': VIDEO_SIZE_CONFIG,
     'user_agent': os.getenv('USER_AGENT', None),
     'locale': os.getenv('LOCALE', 'zh-CN'),
     'timezone_id': os.getenv('TIMEZONE', 'Asia/Shanghai')
@@ -16,6 +16,7 @@ from config.playwright_config import PLAYWRIGHT_CONFIG
 from config.env_config import config_manager
 from utils.logger_config import logger_config, setup_scenario_logger, get_scenario_logger
 from utils.screenshot_helper import ScreenshotHelper
+from utils.video_helper import wait_until_stable
 from loguru import logger
 
 # 初始化全局日志配置（用于非测试场景的日志）
@@ -47,18 +48,25 @@ def pytest_configure(config):
             config.option.alluredir = allure_results_dir
             config.option.allure_report_dir = allure_results_dir
         else:
-            # 查找最新的会话目录
-            reports_dir = Path('reports')
-            if reports_dir.exists():
-                session_dirs = [d for d in reports_dir.iterdir() if d.is_dir() and d.name.startswith('test_session_')]
-                if session_dirs:
-                    current_session_dir = max(session_dirs, key=lambda x: x.stat().st_mtime)
-                    config._current_session_dir = current_session_dir
-                    
-                    # 为worker进程设置Allure配置
-                    allure_results_dir = str(current_session_dir / 'allure-results')
-                    config.option.alluredir = allure_results_dir
-                    config.option.allure_report_dir = allure_results_dir
+            # 查找最新的会话目录（os.scandir 复用目录项信息，避免逐项构造 Path）
+            try:
+                with os.scandir('reports') as entries:
+                    session_dirs = [
+                        entry for entry in entries
+                        if entry.name.startswith('test_session_') and entry.is_dir()
+                    ]
+            except FileNotFoundError:
+                session_dirs = []
+            
+            if session_dirs:
+                latest_dir = max(session_dirs, key=lambda entry: entry.stat().st_mtime)
+                current_session_dir = Path(latest_dir.path)
+                config._current_session_dir = current_session_dir
+                
+                # 为worker进程设置Allure配置
+                allure_results_dir = str(current_session_dir / 'allure-results')
+                config.option.alluredir = allure_results_dir
+                config.option.allure_report_dir = allure_results_dir
         return
     
     # 生成基于时间戳的报告目录名
@@ -213,13 +221,14 @@ def pytest_runtest_makereport(item, call):
                             
                             # 使用超时控制截图
                             if hasattr(page, 'screenshot'):
-                                page.screenshot(path=screenshot_path, timeout=3000)  # 3秒超时
+                                # 截图时同时返回图片字节，附加到报告时无需再读回文件
+                                screenshot_bytes = page.screenshot(path=screenshot_path, timeout=3000)  # 3秒超时
                                 logger.info(f"失败截图已保存: {screenshot_path}")
                                 
                                 # 添加到Allure报告
                                 try:
                                     import allure
-                                    allure.attach.file(screenshot_path, name="失败截图", attachment_type=allure.attachment_type.PNG)
+                                    allure.attach(screenshot_bytes, name="失败截图", attachment_type=allure.attachment_type.PNG)
                                 except Exception as e:
                                     logger.warning(f"Allure截图附件添加失败: {e}")
                                     
@@ -295,21 +304,18 @@ def test_logger(request):
                     page = request.node.funcargs.get('page')
                 
                 if page and hasattr(page, 'video') and page.video:
-                    import time
-                    import os
-                    
-                    # 等待视频文件写入完成
-                    time.sleep(1)
-                    
                     try:
                         video_path = page.video.path()
+                        # 等待视频文件写入完成（大小稳定即返回，最多等待1秒）
+                        if video_path:
+                            wait_until_stable(video_path, timeout=1.0)
                         if video_path and os.path.exists(video_path):
-                            with open(video_path, 'rb') as video_file:
-                                allure.attach(
-                                    video_file.read(),
-                                    name=f"失败测试视频_{test_name}",
-                                    attachment_type=allure.attachment_type.WEBM
-                                )
+                            # 按路径附加，由 Allure 直接复制文件，不把整段视频读入内存
+                            allure.attach.file(
+                                video_path,
+                                name=f"失败测试视频_{test_name}",
+                                attachment_type=allure.attachment_type.WEBM
+                            )
                             logger.info(f"视频已添加到Allure报告: {video_path}")
                     except Exception as e:
                         logger.error(f"添加视频到Allure报告失败: {e}")
@@ -326,18 +332,16 @@ def test_logger(request):
                     page = request.node.funcargs.get('page')
                 
                 if page and hasattr(page, 'video') and page.video:
-                    import asyncio
-                    import os
-                    import time
-                    
-                    # 等待一小段时间确保视频文件已写入
-                    time.sleep(0.5)
-                    
                     try:
                         video_path = page.video.path()
-                        if video_path and os.path.exists(video_path):
-                            os.remove(video_path)
-                            logger.info(f"已删除通过测试的视频文件: {video_path}")
+                        try:
+                            # 由 Playwright 删除视频，必要时等待录制结束，无需轮询文件状态
+                            page.video.delete()
+                        except Exception:
+                            # 回退：直接删除视频文件
+                            if video_path and os.path.exists(video_path):
+                                os.remove(video_path)
+                        logger.info(f"已删除通过测试的视频文件: {video_path}")
                     except Exception as e:
                         logger.warning(f"删除视频文件失败: {e}")
                         
@@ -0,0 +1,18 @@
+"""文件系统辅助工具"""
+from pathlib import Path
+
+
+# 本进程内已确认存在的目录，避免每次创建助手实例都执行 mkdir
+_ENSURED_DIRS: set = set()
+
+
+def ensure_dir(path: Path) -> None:
+    """确保目录存在，同一路径在进程内只创建一次
+    
+    Args:
+        path: 目录路径
+    """
+    key = str(path)
+    if key not in _ENSURED_DIRS:
+        path.mkdir(parents=True, exist_ok=True)
+        _ENSURED_DIRS.add(key)
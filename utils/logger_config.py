@@ -1,50 +1,161 @@
 """日志配置工具"""
-import hashlib
+import functools
 import os
+import re
 import sys
 import time
 import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import Optional, Dict
 
 from loguru import logger
 
 
+# 日志级别名称到数值的映射，导入时从 loguru 解析一次
+_LEVEL_NO = {
+    name: logger.level(name).no
+    for name in ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+}
+
+# 辅助方法常用级别的数值，用于在构建消息前判断级别是否启用
+_DEBUG_NO = _LEVEL_NO["DEBUG"]
+_INFO_NO = _LEVEL_NO["INFO"]
+
+
+def _min_level() -> int:
+    """获取 loguru 所有处理器中的最低级别数值
+    
+    依赖 loguru 的私有属性 _core.min_level，属性不存在时返回 0，
+    即不拦截任何日志，避免 loguru 升级后所有日志辅助方法抛出异常。
+    
+    Returns:
+        最低级别数值
+    """
+    return getattr(getattr(logger, "_core", None), "min_level", 0)
+
+
+def _level_no(level: str) -> Optional[int]:
+    """获取日志级别名称对应的数值（不区分大小写）
+    
+    Args:
+        level: 日志级别名称
+        
+    Returns:
+        级别数值，loguru 中不存在该级别时返回 None
+    """
+    name = level.upper()
+    no = _LEVEL_NO.get(name)
+    if no is None:
+        try:
+            no = logger.level(name).no
+        except ValueError:
+            return None
+    return no
+
+
+# 辅助方法使用的日志器，记录调用方而非辅助方法本身的位置信息
+_caller_logger = logger.opt(depth=1)
+
+# 支持的日志级别名称
+_VALID_LEVELS = frozenset(_LEVEL_NO)
+
+# 环境变量中的日志级别，导入时读取一次（未设置时为空字符串）
+_ENV_LEVEL = os.getenv("LOG_LEVEL", "").upper()
+
+# 统一的日志格式，所有处理器共享同一字符串对象
+_CONSOLE_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | "
+    "<level>{level: <8}</level> | "
+    "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> | "
+    "<level>{message}</level>"
+)
+_FILE_FORMAT = (
+    "{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | "
+    "{process.id}:{thread.id} | {name}:{function}:{line} | {message}"
+)
+
+
 class LoggerConfig:
     """日志配置类"""
     
+    __slots__ = (
+        'log_dir',
+        '_level_dispatch',
+        '_log_cache',
+        '_cache_size_limit',
+        '_dedup_window',
+        '_dedup_window_ns',
+        '_lock',
+        '_scenario_dirs',
+        '_configured_handlers',
+        '_setup_args',
+        '_diagnose'
+    )
+    
+    # 测试结果对应的表情符号
+    _RESULT_EMOJI = {
+        "PASSED": "✅",
+        "FAILED": "❌",
+        "SKIPPED": "⏭️"
+    }
+    _RESULT_EMOJI_GET = _RESULT_EMOJI.get
+    
+    # 断言结果对应的表情符号和文字，按 bool(result) 索引
+    _ASSERT_MARKS = (("❌", "失败"), ("✅", "通过"))
+    
+    # 控制台过滤关键字（忽略大小写匹配，避免复制整条消息）
+    _FILTER_RE = re.compile(r'debug|trace', re.IGNORECASE)
+    
     def __init__(self):
+        # 日志目录由文件处理器在首次写入时创建
         self.log_dir = Path("logs")
-        self.log_dir.mkdir(exist_ok=True)
         
-        # 日志级别映射
-        self.level_mapping = {
-            "DEBUG": "DEBUG",
-            "INFO": "INFO", 
-            "WARNING": "WARNING",
-            "ERROR": "ERROR",
-            "CRITICAL": "CRITICAL"
-        }
+        # 日志级别到记录方法的映射，避免每次调用时 lower() + getattr
+        self._level_dispatch = {lvl: getattr(logger, lvl.lower()) for lvl in _LEVEL_NO}
         
         # 日志去重缓存
-        self._log_cache = {}
+        self._log_cache = OrderedDict()
         self._cache_size_limit = 1000
         self._dedup_window = 5  # 5秒内的重复日志将被去重
-        self._cleanup_counter = 0  # 清理计数器
+        self._dedup_window_ns = self._dedup_window * 1_000_000_000
         
         # 多进程安全锁
         self._lock = threading.Lock()
         
         # 场景目录缓存
         self._scenario_dirs = {}
-        self._scenario_cache_lock = threading.Lock()
         
-        # 已配置的日志处理器缓存
+        # 已配置的日志处理器缓存（"console" 或 (场景, 名称) 元组）
         self._configured_handlers = set()
+        
+        # 最近一次 setup_logger 成功使用的参数，用于避免重复配置
+        self._setup_args = None
+        
+        # 异常回溯与变量诊断开销较大，仅在 LOG_DIAGNOSE=true 时开启
+        self._diagnose = os.getenv("LOG_DIAGNOSE", "false").lower() == "true"
+    
+    @staticmethod
+    def _resolve_level(level: str) -> str:
+        """解析实际使用的日志级别
+        
+        Args:
+            level: 调用方指定的日志级别
+            
+        Returns:
+            日志级别名称，环境变量 LOG_LEVEL 优先，无效时回退为 INFO
+        """
+        log_level = _ENV_LEVEL or level.upper()
+        if log_level not in _VALID_LEVELS:
+            log_level = "INFO"
+        return log_level
     
     def _should_log(self, message: str, level: str) -> bool:
         """检查是否应该记录日志（去重检查）
         
+        去重窗口内被跳过的重复日志会被计数，在同一日志再次输出时
+        补记一条重复次数汇总，避免丢失信息。
+        
         Args:
             message: 日志消息
             level: 日志级别
@@ -52,84 +163,62 @@ class LoggerConfig:
         Returns:
             是否应该记录日志
         """
-        # 生成消息的哈希值作为缓存键
-        message_hash = hashlib.md5(f"{level}:{message}".encode()).hexdigest()
-        current_time = time.time()
-        
-        # 检查缓存中是否存在相同的日志
-        if message_hash in self._log_cache:
-            last_time = self._log_cache[message_hash]
-            # 如果在去重窗口时间内，则跳过
-            if current_time - last_time < self._dedup_window:
+        # 直接以 (级别, 消息) 元组作为缓存键，由字典负责哈希
+        message_hash = (level, message)
+        # 单调时钟的整数纳秒，不受系统时间调整影响
+        current_time = time.monotonic_ns()
+        
+        # 缓存项为 [上次输出时间, 窗口内被跳过的次数]（单次查找，未命中时返回None）
+        entry = self._log_cache.get(message_hash)
+        if entry is not None:
+            # 命中时移到末尾，保持最近使用顺序
+            self._log_cache.move_to_end(message_hash)
+            # 如果在去重窗口时间内，则计数后跳过
+            if current_time - entry[0] < self._dedup_window_ns:
+                entry[1] += 1
                 return False
+            self._log_repeated(level, message, entry[1])
+            entry[0] = current_time
+            entry[1] = 0
+            return True
         
         # 更新缓存
-        self._log_cache[message_hash] = current_time
+        self._log_cache[message_hash] = [current_time, 0]
         
-        # 清理过期的缓存项
-        self._cleanup_cache(current_time)
+        # 超过容量时淘汰最久未使用的缓存项
+        if len(self._log_cache) > self._cache_size_limit:
+            self._log_cache.popitem(last=False)
         
         return True
     
-    def _cleanup_cache(self, current_time: float) -> None:
-        """清理过期的缓存项
+    def _log_repeated(self, level: str, message: str, count: int) -> None:
+        """补记去重窗口内被跳过的重复日志次数
         
         Args:
-            current_time: 当前时间戳
+            level: 日志级别
+            message: 日志消息
+            count: 被跳过的次数
         """
-        # 增加清理计数器
-        self._cleanup_counter += 1
-        
-        # 定期清理或缓存超过限制时清理
-        if len(self._log_cache) > self._cache_size_limit or self._cleanup_counter >= 100:
-            expired_keys = [
-                key for key, timestamp in self._log_cache.items()
-                if current_time - timestamp > self._dedup_window * 2
-            ]
-            for key in expired_keys:
-                del self._log_cache[key]
-            
-            # 如果清理后仍然超过限制，强制清理一半缓存
-            if len(self._log_cache) > self._cache_size_limit:
-                cache_items = list(self._log_cache.items())
-                # 保留较新的一半
-                cache_items.sort(key=lambda x: x[1], reverse=True)
-                self._log_cache = dict(cache_items[:self._cache_size_limit//2])
-            
-            # 重置计数器
-            self._cleanup_counter = 0
+        if count:
+            self._get_log_func(level)("[{}秒内重复 {} 次] {}", self._dedup_window, count, message)
     
-    def _cleanup_cache(self, current_time: float) -> None:
-        """清理过期的缓存项
+    def _get_log_func(self, level: str):
+        """获取日志级别对应的记录方法（兼容小写级别名）
         
         Args:
-            current_time: 当前时间戳
-        """
-        # 增加清理计数器
-        self._cleanup_counter += 1
-        
-        # 定期清理或缓存超过限制时清理
-        if len(self._log_cache) > self._cache_size_limit or self._cleanup_counter >= 100:
-            expired_keys = [
-                key for key, timestamp in self._log_cache.items()
-                if current_time - timestamp > self._dedup_window * 2
-            ]
-            for key in expired_keys:
-                del self._log_cache[key]
-            
-            # 如果清理后仍然超过限制，强制清理一半缓存
-            if len(self._log_cache) > self._cache_size_limit:
-                cache_items = list(self._log_cache.items())
-                # 保留较新的一半
-                cache_items.sort(key=lambda x: x[1], reverse=True)
-                self._log_cache = dict(cache_items[:self._cache_size_limit//2])
+            level: 日志级别
             
-            # 重置计数器
-            self._cleanup_counter = 0
-        
-        return True
+        Returns:
+            loguru 的记录方法
+        """
+        log_func = self._level_dispatch.get(level)
+        if log_func is None:
+            log_func = getattr(logger, level.lower())
+        return log_func
     
-    def _get_scenario_from_test_path(self, test_path: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=2048)
+    def _get_scenario_from_test_path(test_path: str) -> str:
         """从测试路径中提取场景名称
         
         Args:
@@ -140,28 +229,29 @@ class LoggerConfig:
         """
         try:
             # 处理pytest节点ID格式 (如: testcase/version_creation_scene/test_login.py::test_login)
-            if '::' in test_path:
-                test_path = test_path.split('::')[0]
+            test_path = test_path.partition('::')[0]
             
-            # 标准化路径分隔符
-            test_path = test_path.replace('\\', '/').replace('\\', '/')
+            # 标准化路径分隔符，并补上前导分隔符以便匹配相对路径开头的testcase
+            test_path = '/' + test_path.replace('\\', '/')
             
-            # 查找testcase目录后的第一个子目录
-            parts = test_path.split('/')
-            if 'testcase' in parts:
-                testcase_index = parts.index('testcase')
-                if testcase_index + 1 < len(parts):
-                    scenario = parts[testcase_index + 1]
-                    # 过滤掉文件名，只保留目录名
-                    if not scenario.endswith('.py'):
-                        return scenario
+            # 直接定位testcase目录，取其后的第一个路径片段
+            start = test_path.find('/testcase/')
+            if start >= 0:
+                rest = test_path[start + len('/testcase/'):]
+                end = rest.find('/')
+                scenario = rest if end < 0 else rest[:end]
+                # 过滤掉文件名，只保留目录名
+                if scenario and not scenario.endswith('.py'):
+                    return scenario
             
             return 'Global'
         except Exception:
             return 'Global'
     
-    def _ensure_scenario_log_dir(self, scenario: str) -> Path:
-        """确保场景日志目录存在
+    def _get_scenario_log_dir(self, scenario: str) -> Path:
+        """获取场景日志目录路径
+        
+        目录由文件处理器在首次写入时创建，这里只缓存路径
         
         Args:
             scenario: 场景名称
@@ -169,28 +259,33 @@ class LoggerConfig:
         Returns:
             场景日志目录路径
         """
-        with self._scenario_cache_lock:
-            if scenario not in self._scenario_dirs:
-                scenario_dir = self.log_dir / scenario
-                scenario_dir.mkdir(exist_ok=True)
-                self._scenario_dirs[scenario] = scenario_dir
-            return self._scenario_dirs[scenario]
+        scenario_dir = self._scenario_dirs.get(scenario)
+        if scenario_dir is None:
+            scenario_dir = self._scenario_dirs[scenario] = self.log_dir / scenario
+        return scenario_dir
     
-    def _discover_test_scenarios(self) -> list:
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _discover_test_scenarios() -> tuple:
         """自动发现testcase目录下的测试场景
         
+        结果会被缓存，目录结构变化后可调用 cache_clear() 重新扫描
+        
         Returns:
-            场景目录名称列表
+            场景目录名称元组
         """
         scenarios = ['Global']  # 默认全局场景
-        testcase_dir = Path('testcase')
         
-        if testcase_dir.exists():
-            for item in testcase_dir.iterdir():
-                if item.is_dir() and not item.name.startswith('__'):
-                    scenarios.append(item.name)
+        try:
+            with os.scandir('testcase') as entries:
+                scenarios.extend(
+                    entry.name for entry in entries
+                    if entry.is_dir() and not entry.name.startswith('__')
+                )
+        except FileNotFoundError:
+            pass
         
-        return scenarios
+        return tuple(scenarios)
     
     def log_with_dedup(self, level: str, message: str) -> None:
         """带去重功能的日志记录
@@ -199,8 +294,12 @@ class LoggerConfig:
             level: 日志级别
             message: 日志消息
         """
+        # 级别低于 loguru 所有处理器的最低级别时直接返回，跳过去重计算
+        level_no = _level_no(level)
+        if level_no is not None and level_no < _min_level():
+            return
         if self._should_log(message, level):
-            getattr(logger, level.lower())(message)
+            self._get_log_func(level)(message)
     
     def setup_scenario_logger(
         self,
@@ -212,10 +311,15 @@ class LoggerConfig:
         file_output: bool = True,
         rotation: str = "10 MB",
         retention: str = "30 days",
-        compression: str = "zip"
+        compression: Optional[str] = None,
+        enqueue: bool = False
     ) -> None:
         """设置场景感知的日志配置
         
+        文件处理器使用 loguru 默认的行缓冲：每条日志立即写入文件，进程被强制
+        结束（如 pytest-timeout 终止卡住的用例）时也不会丢失最后的日志，
+        代价是每条日志一次写系统调用。
+        
         Args:
             scenario: 场景名称，如果为None则从test_path自动识别
             test_path: 测试路径，用于自动识别场景
@@ -225,7 +329,8 @@ class LoggerConfig:
             file_output: 是否输出到文件
             rotation: 日志轮转大小
             retention: 日志保留时间
-            compression: 压缩格式
+            compression: 轮转文件的压缩格式（默认不压缩，避免轮转时在写日志线程中同步压缩）
+            enqueue: 是否通过队列异步写入（仅在多进程共享日志器时需要）
         """
         # 确定场景名称
         if scenario is None and test_path:
@@ -233,71 +338,75 @@ class LoggerConfig:
         elif scenario is None:
             scenario = 'Global'
         
+        # 已配置过该场景的日志时无需加锁
+        handler_key = (scenario, name)
+        if handler_key in self._configured_handlers:
+            return
+        
         # 使用锁确保多进程安全
         with self._lock:
-            # 检查是否已经配置过该场景的日志
-            handler_key = f"{scenario}_{name}"
+            # 加锁后再次检查，避免并发重复配置
             if handler_key in self._configured_handlers:
                 return
             
             # 移除默认处理器（仅在第一次配置时）
             if not self._configured_handlers:
                 logger.remove()
+                self._setup_args = None
             
-            # 获取环境变量中的日志级别
-            log_level = os.getenv("LOG_LEVEL", level).upper()
-            if log_level not in self.level_mapping:
-                log_level = "INFO"
-            
-            # 统一的日志格式配置
-            formats = self._get_log_formats()
+            log_level = self._resolve_level(level)
             
             # 添加控制台处理器（全局共享）
             if console_output and 'console' not in self._configured_handlers:
                 logger.add(
                     sys.stdout,
-                    format=formats['console'],
+                    format=_CONSOLE_FORMAT,
                     level=log_level,
-                    colorize=True,
-                    backtrace=True,
-                    diagnose=True,
+                    colorize=sys.stdout.isatty(),  # 非终端输出（管道、pytest捕获）时跳过着色
+                    backtrace=self._diagnose,
+                    diagnose=self._diagnose,
+                    enqueue=enqueue,
                     filter=self._console_filter
                 )
                 self._configured_handlers.add('console')
             
             # 添加场景特定的文件处理器
             if file_output:
-                scenario_dir = self._ensure_scenario_log_dir(scenario)
+                scenario_dir = self._get_scenario_log_dir(scenario)
                 
                 try:
-                    # 场景通用日志文件
-                    log_file = scenario_dir / f"{name}.log"
-                    logger.add(
-                        str(log_file),
-                        format=formats['file'],
-                        level=log_level,
-                        rotation=rotation,
-                        retention=retention,
-                        compression=compression,
-                        encoding="utf-8",
-                        enqueue=True,  # 多进程安全
-                        backtrace=True,
-                        diagnose=True
-                    )
+                    # 级别不低于 ERROR 时通用日志与错误日志内容相同，只保留错误日志
+                    if _LEVEL_NO[log_level] < _LEVEL_NO["ERROR"]:
+                        # 场景通用日志文件
+                        log_file = scenario_dir / f"{name}.log"
+                        logger.add(
+                            str(log_file),
+                            format=_FILE_FORMAT,
+                            level=log_level,
+                            rotation=rotation,
+                            retention=retention,
+                            compression=compression,
+                            encoding="utf-8",
+                            delay=True,  # 首次写入时才创建目录和文件
+                            backtrace=self._diagnose,
+                            diagnose=self._diagnose,
+                            enqueue=enqueue
+                        )
                     
                     # 场景错误日志文件
                     error_log_file = scenario_dir / f"{name}_error.log"
                     logger.add(
                         str(error_log_file),
-                        format=formats['file'],
+                        format=_FILE_FORMAT,
                         level="ERROR",
                         rotation=rotation,
                         retention=retention,
                         compression=compression,
                         encoding="utf-8",
-                        enqueue=True,  # 多进程安全
-                        backtrace=True,
-                        diagnose=True
+                        delay=True,  # 首次写入时才创建目录和文件
+                        backtrace=self._diagnose,
+                        diagnose=self._diagnose,
+                        enqueue=enqueue
                     )
                 except Exception as e:
                     # 如果文件日志失败，只使用控制台日志
@@ -314,10 +423,15 @@ class LoggerConfig:
         file_output: bool = True,
         rotation: str = "10 MB",
         retention: str = "30 days",
-        compression: str = "zip"
+        compression: Optional[str] = None,
+        enqueue: bool = False
     ) -> None:
         """设置日志配置
         
+        文件处理器使用 loguru 默认的行缓冲：每条日志立即写入文件，进程被强制
+        结束（如 pytest-timeout 终止卡住的用例）时也不会丢失最后的日志，
+        代价是每条日志一次写系统调用。
+        
         Args:
             name: 日志器名称
             level: 日志级别
@@ -325,90 +439,86 @@ class LoggerConfig:
             file_output: 是否输出到文件
             rotation: 日志轮转大小
             retention: 日志保留时间
-            compression: 压缩格式
+            compression: 轮转文件的压缩格式（默认不压缩，避免轮转时在写日志线程中同步压缩）
+            enqueue: 是否通过队列异步写入（仅在多进程共享日志器时需要）
         """
-        # 移除默认处理器
-        logger.remove()
+        log_level = self._resolve_level(level)
         
-        # 获取环境变量中的日志级别
-        log_level = os.getenv("LOG_LEVEL", level).upper()
-        if log_level not in self.level_mapping:
-            log_level = "INFO"
+        # 相同参数已配置过时直接返回，避免重复移除和添加处理器
+        setup_args = (name, log_level, console_output, file_output, rotation, retention, compression, enqueue)
+        if self._setup_args == setup_args:
+            return
         
-        # 统一的日志格式配置
-        formats = self._get_log_formats()
+        # 移除默认处理器
+        logger.remove()
+        self._setup_args = None
+        # 场景处理器已随之移除，清空标记以便后续重新配置
+        self._configured_handlers.clear()
         
         # 添加控制台处理器
         if console_output:
             logger.add(
                 sys.stdout,
-                format=formats['console'],
+                format=_CONSOLE_FORMAT,
                 level=log_level,
-                colorize=True,
-                backtrace=True,
-                diagnose=True,
+                colorize=sys.stdout.isatty(),  # 非终端输出（管道、pytest捕获）时跳过着色
+                backtrace=self._diagnose,
+                diagnose=self._diagnose,
+                enqueue=enqueue,
                 filter=self._console_filter
             )
         
         # 添加文件处理器
         if file_output:
             try:
-                # 通用日志文件
-                log_file = self.log_dir / f"{name}.log"
-                logger.add(
-                    str(log_file),
-                    format=formats['file'],
-                    level=log_level,
-                    rotation=rotation,
-                    retention=retention,
-                    compression=compression,
-                    encoding="utf-8",
-                    enqueue=True,
-                    backtrace=True,
-                    diagnose=True
-                )
+                # 级别不低于 ERROR 时通用日志与错误日志内容相同，只保留错误日志
+                if _LEVEL_NO[log_level] < _LEVEL_NO["ERROR"]:
+                    # 通用日志文件
+                    log_file = self.log_dir / f"{name}.log"
+                    logger.add(
+                        str(log_file),
+                        format=_FILE_FORMAT,
+                        level=log_level,
+                        rotation=rotation,
+                        retention=retention,
+                        compression=compression,
+                        encoding="utf-8",
+                        delay=True,  # 首次写入时才创建目录和文件
+                        backtrace=self._diagnose,
+                        diagnose=self._diagnose,
+                        enqueue=enqueue
+                    )
                 
                 # 错误日志文件
                 error_log_file = self.log_dir / f"{name}_error.log"
                 logger.add(
                     str(error_log_file),
-                    format=formats['file'],
+                    format=_FILE_FORMAT,
                     level="ERROR",
                     rotation=rotation,
                     retention=retention,
                     compression=compression,
                     encoding="utf-8",
-                    enqueue=True,
-                    backtrace=True,
-                    diagnose=True
+                    delay=True,  # 首次写入时才创建目录和文件
+                    backtrace=self._diagnose,
+                    diagnose=self._diagnose,
+                    enqueue=enqueue
                 )
             except Exception as e:
                 # 如果文件日志失败，只使用控制台日志
                 # 这里不能使用logger，因为logger还没有完全设置好
                 sys.stderr.write(f"Warning: Could not setup file logging: {e}\n")
-    
-    def _get_log_formats(self) -> dict:
-        """获取统一的日志格式"""
-        return {
-            'console': (
-                "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | "
-                "<level>{level: <8}</level> | "
-                "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> | "
-                "<level>{message}</level>"
-            ),
-            'file': (
-                "{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | "
-                "{process.id}:{thread.id} | {name}:{function}:{line} | {message}"
-            )
-        }
+                return
+        
+        # 记录本次成功的配置参数
+        self._setup_args = setup_args
     
     def _console_filter(self, record):
         """控制台日志过滤器"""
-        # 过滤掉一些不重要的日志
-        message = record['message']
-        if any(keyword in message.lower() for keyword in ['debug', 'trace']):
-            return record['level'].name != 'DEBUG'
-        return True
+        # 过滤掉包含 debug/trace 关键字的 DEBUG 日志，非 DEBUG 日志无需扫描消息
+        if record['level'].name != 'DEBUG':
+            return True
+        return self._FILTER_RE.search(record['message']) is None
     
     def get_test_logger(self, test_name: str) -> logger:
         """获取测试专用日志器
@@ -444,16 +554,21 @@ class LoggerConfig:
         # 返回绑定场景信息的日志器
         return logger.bind(scenario=scenario)
     
-    def log_test_start(self, test_name: str, test_data: Optional[dict] = None) -> None:
+    @staticmethod
+    def log_test_start(test_name: str, test_data: Optional[dict] = None) -> None:
         """记录测试开始
         
         Args:
             test_name: 测试名称
             test_data: 测试数据
         """
-        logger.info(f"🚀 开始执行测试: {test_name}")
+        # 所有处理器均未启用 INFO 时直接返回，不构建消息
+        if _min_level() > _INFO_NO:
+            return
+        _caller_logger.info(f"🚀 开始执行测试: {test_name}")
         if test_data:
-            logger.debug(f"测试数据: {test_data}")
+            # 以参数形式传入，级别未启用时不会格式化测试数据
+            _caller_logger.debug("测试数据: {}", test_data)
     
     def log_test_end(self, test_name: str, result: str, duration: Optional[float] = None) -> None:
         """记录测试结束
@@ -463,27 +578,32 @@ class LoggerConfig:
             result: 测试结果 (PASSED/FAILED/SKIPPED)
             duration: 执行时长(秒)
         """
-        emoji = {
-            "PASSED": "✅",
-            "FAILED": "❌", 
-            "SKIPPED": "⏭️"
-        }.get(result, "❓")
+        # 所有处理器均未启用 INFO 时直接返回，不构建消息
+        if _min_level() > _INFO_NO:
+            return
+        emoji = self._RESULT_EMOJI_GET(result, "❓")
         
         duration_str = f" (耗时: {duration:.2f}s)" if duration else ""
-        logger.info(f"{emoji} 测试完成: {test_name} - {result}{duration_str}")
+        _caller_logger.info(f"{emoji} 测试完成: {test_name} - {result}{duration_str}")
     
-    def log_step(self, step_name: str, step_data: Optional[dict] = None) -> None:
+    @staticmethod
+    def log_step(step_name: str, step_data: Optional[dict] = None) -> None:
         """记录测试步骤
         
         Args:
             step_name: 步骤名称
             step_data: 步骤数据
         """
-        logger.info(f"📋 执行步骤: {step_name}")
+        # 所有处理器均未启用 INFO 时直接返回，不构建消息
+        if _min_level() > _INFO_NO:
+            return
+        _caller_logger.info(f"📋 执行步骤: {step_name}")
         if step_data:
-            logger.debug(f"步骤数据: {step_data}")
+            # 以参数形式传入，级别未启用时不会格式化步骤数据
+            _caller_logger.debug("步骤数据: {}", step_data)
     
-    def log_assertion(self, assertion: str, result: bool, actual=None, expected=None) -> None:
+    @staticmethod
+    def log_assertion(assertion: str, result: bool, actual=None, expected=None) -> None:
         """记录断言结果
         
         Args:
@@ -492,23 +612,28 @@ class LoggerConfig:
             actual: 实际值
             expected: 期望值
         """
-        emoji = "✅" if result else "❌"
-        logger.info(f"{emoji} 断言: {assertion} - {'通过' if result else '失败'}")
+        emoji, result_text = LoggerConfig._ASSERT_MARKS[bool(result)]
+        _caller_logger.info(f"{emoji} 断言: {assertion} - {result_text}")
         
         if not result and actual is not None and expected is not None:
-            logger.error(f"期望值: {expected}, 实际值: {actual}")
+            _caller_logger.error(f"期望值: {expected}, 实际值: {actual}")
     
-    def log_screenshot(self, screenshot_path: str, description: str = "") -> None:
+    @staticmethod
+    def log_screenshot(screenshot_path: str, description: str = "") -> None:
         """记录截图信息
         
         Args:
             screenshot_path: 截图路径
             description: 截图描述
         """
+        # 所有处理器均未启用 INFO 时直接返回，不构建消息
+        if _min_level() > _INFO_NO:
+            return
         desc = f" - {description}" if description else ""
-        logger.info(f"📸 截图已保存: {screenshot_path}{desc}")
+        _caller_logger.info(f"📸 截图已保存: {screenshot_path}{desc}")
     
-    def log_page_action(self, action: str, element: str = "", value: str = "") -> None:
+    @staticmethod
+    def log_page_action(action: str, element: str = "", value: str = "") -> None:
         """记录页面操作
         
         Args:
@@ -516,9 +641,22 @@ class LoggerConfig:
             element: 元素定位器
             value: 操作值
         """
-        element_str = f" 元素: {element}" if element else ""
-        value_str = f" 值: {value}" if value else ""
-        logger.debug(f"🖱️ 页面操作: {action}{element_str}{value_str}")
+        # 以 python -O 运行时编译期即直接返回，完全跳过页面操作日志
+        if not __debug__:
+            return
+        # 所有处理器均未启用 DEBUG 时直接返回，不构建消息
+        if _min_level() > _DEBUG_NO:
+            return
+        # 按分支直接构建完整消息，避免拼接中间字符串
+        if element and value:
+            message = f"🖱️ 页面操作: {action} 元素: {element} 值: {value}"
+        elif element:
+            message = f"🖱️ 页面操作: {action} 元素: {element}"
+        elif value:
+            message = f"🖱️ 页面操作: {action} 值: {value}"
+        else:
+            message = f"🖱️ 页面操作: {action}"
+        _caller_logger.debug(message)
 
 
 # 全局日志配置实例
@@ -532,7 +670,8 @@ def setup_logger(
     file_output: bool = True,
     rotation: str = "10 MB",
     retention: str = "30 days",
-    compression: str = "zip"
+    compression: Optional[str] = None,
+    enqueue: bool = False
 ) -> None:
     """设置日志配置的便捷函数"""
     logger_config.setup_logger(
@@ -542,7 +681,8 @@ def setup_logger(
         file_output=file_output,
         rotation=rotation,
         retention=retention,
-        compression=compression
+        compression=compression,
+        enqueue=enqueue
     )
 
 
@@ -555,7 +695,8 @@ def setup_scenario_logger(
     file_output: bool = True,
     rotation: str = "10 MB",
     retention: str = "30 days",
-    compression: str = "zip"
+    compression: Optional[str] = None,
+    enqueue: bool = False
 ) -> None:
     """设置场景感知日志配置的便捷函数"""
     logger_config.setup_scenario_logger(
@@ -567,7 +708,8 @@ def setup_scenario_logger(
         file_output=file_output,
         rotation=rotation,
         retention=retention,
-        compression=compression
+        compression=compression,
+        enqueue=enqueue
     )
 
 
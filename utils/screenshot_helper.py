@@ -1,15 +1,52 @@
 """截图助手工具"""
 import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, Union, Dict, Any, Tuple
-from playwright.sync_api import Page
+from playwright.sync_api import Page, Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
 from loguru import logger
+from utils.file_helper import ensure_dir
+
+
+# 可识别的图片扩展名
+_KNOWN_EXT = ('.png', '.jpg', '.jpeg')
+
+# 选择器中不能（或不宜）出现在文件名里的字符统一替换为下划线
+_SELECTOR_TRANS = str.maketrans({c: '_' for c in ' >[]().#:"\'/\\*?|<=,'})
+
+
+def _unlink_quietly(path: str) -> bool:
+    """删除文件，文件已不存在时忽略
+    
+    Args:
+        path: 文件路径
+        
+    Returns:
+        是否删除了文件
+    """
+    try:
+        os.unlink(path)
+        return True
+    except FileNotFoundError:
+        return False
 
 
 class ScreenshotHelper:
     """截图助手类"""
     
+    # 各类截图的编码策略对应的质量：速度优先/均衡使用 JPEG，质量优先（100）保存为无损 PNG
+    FORMAT_POLICY_QUALITY: Dict[str, int] = {
+        'speed': 60,
+        'balanced': 80,
+        'quality': 100
+    }
+    
+    # 整页截图的最大高度（视口高度的倍数），超长页面只截取顶部区域；设为 None 时截取完整页面
+    full_page_max_multiplier: Optional[float] = 4.0
+    
     def __init__(self, page: Page, base_path: str = "reports/screenshots") -> None:
         """
         初始化截图助手
@@ -19,24 +56,31 @@ class ScreenshotHelper:
             base_path: 截图保存基础路径
         """
         self.page: Page = page
+        # 页面关闭状态检查方法只解析一次（测试替身可能没有 is_closed）
+        self._is_closed = page.is_closed if hasattr(page, 'is_closed') else (lambda: False)
         self.base_path: Path = Path(base_path)
-        self.base_path.mkdir(parents=True, exist_ok=True)
+        ensure_dir(self.base_path)
+        # 带结尾分隔符的目录字符串，截图路径直接拼接，无需每次构造 Path
+        self._base_prefix: str = os.path.join(str(self.base_path), '')
         
-        # 截图配置
+        # 截图配置（整页截图开销大，由调用方按需开启）
         self.default_config: Dict[str, Any] = {
-            'full_page': True,
             'type': 'png',
             'animations': 'disabled'
         }
+        
+        # 编码格式：默认 JPEG，需要无损图像（如失败对比）时可设为 'png'
+        self.encode_format: str = 'jpeg'
     
     def take_screenshot(
         self,
         filename: Optional[str] = None,
         description: str = "",
-        full_page: bool = True,
+        full_page: bool = False,
         element_selector: Optional[str] = None,
-        quality: int = 80,
+        quality: int = 70,
         max_retries: int = 3,
+        wait_for: Optional[str] = None,
         **kwargs
     ) -> Optional[str]:
         """
@@ -47,40 +91,46 @@ class ScreenshotHelper:
             description: 截图描述
             full_page: 是否截取整个页面
             element_selector: 元素选择器，如果提供则只截取该元素
-            quality: 截图质量 (1-100)
+            quality: 截图质量 (1-100)，保存为 JPEG 时生效；文件名未指定扩展名时，
+                小于100且编码格式为 JPEG 则保存为 JPEG，否则保存为 PNG
+            max_retries: 最大尝试次数
+            wait_for: 截图前等待的页面加载状态 ('domcontentloaded'/'load'/'networkidle')，
+                默认不等待；截图为尽力而为，等待超时（500毫秒）不影响截图
             **kwargs: 其他截图参数
             
         Returns:
             截图文件路径，失败返回 None
         """
+        # 生成文件名
+        if not filename:
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')[:-3]
+            filename = f"screenshot_{timestamp}"
+        
+        # 调用方指定了扩展名时按扩展名选择编码格式，保留原文件名；否则按编码策略补全扩展名
+        lower_name = filename.lower()
+        if lower_name.endswith(_KNOWN_EXT):
+            use_jpeg = not lower_name.endswith('.png')
+        else:
+            use_jpeg = self.encode_format == 'jpeg' and quality < 100
+            filename += '.jpg' if use_jpeg else '.png'
+        
+        # 获取唯一文件路径，避免冲突（只解析一次，各次重试写入同一文件）
+        file_path = self._get_unique_filepath(filename)
+        
         for attempt in range(max_retries):
             try:
                 # 检查页面状态
-                if hasattr(self.page, 'is_closed') and self.page.is_closed():
+                if self._is_closed():
                     logger.warning("页面已关闭，无法截图")
-                    return None
-                
-                # 生成文件名
-                if not filename:
-                    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')[:-3]
-                    filename = f"screenshot_{timestamp}.png"
-                
-                # 根据质量设置确定文件格式
-                if quality < 100 and not filename.endswith(('.png', '.jpg', '.jpeg')):
-                    filename = filename.rsplit('.', 1)[0] + '.jpg' if '.' in filename else filename + '.jpg'
-                elif not filename.endswith(('.png', '.jpg', '.jpeg')):
-                    filename += '.png'
-                
-                # 获取唯一文件路径，避免冲突
-                file_path = self._get_unique_filepath(filename)
+                    break
                 
                 # 合并截图配置
                 screenshot_config = {**self.default_config, **kwargs}
                 screenshot_config['full_page'] = full_page
-                screenshot_config['path'] = str(file_path)
+                screenshot_config['path'] = file_path
                 
                 # 设置图片质量和格式
-                if quality < 100:
+                if use_jpeg:
                     screenshot_config['type'] = 'jpeg'
                     screenshot_config['quality'] = quality
                 
@@ -88,81 +138,131 @@ class ScreenshotHelper:
                 if 'timeout' not in screenshot_config:
                     screenshot_config['timeout'] = 30000  # 30秒超时
                 
-                # 等待页面稳定
-                try:
-                    self.page.wait_for_load_state('networkidle', timeout=5000)
-                except Exception:
-                    pass  # 忽略网络空闲等待失败
+                # 按需等待页面稳定（多数页面因轮询等请求达不到网络空闲，默认不等待）
+                if wait_for:
+                    try:
+                        self.page.wait_for_load_state(wait_for, timeout=500)
+                    except Exception:
+                        pass  # 忽略加载状态等待失败
                 
                 # 截图
                 if element_selector:
                     # 截取特定元素
                     element = self.page.locator(element_selector)
-                    if element.count() > 0:
-                        # 等待元素可见
-                        element.wait_for(state='visible', timeout=5000)
-                        element.screenshot(**screenshot_config)
-                    else:
-                        logger.warning(f"未找到元素: {element_selector}，改为截取整页")
+                    try:
+                        # 单次等待元素可见，元素不存在时同样以超时结束
+                        element.wait_for(state='visible', timeout=2000)
+                    except PlaywrightTimeoutError:
+                        # 元素存在但不可见时按截图失败处理，不悄悄改为页面截图
+                        if element.count() > 0:
+                            raise
+                        logger.warning(f"未找到元素: {element_selector}，改为截取页面")
                         self.page.screenshot(**screenshot_config)
+                    else:
+                        # 元素截图不支持 full_page 参数
+                        screenshot_config.pop('full_page', None)
+                        element.screenshot(**screenshot_config)
                 else:
                     # 截取整页或视口
+                    if full_page and 'clip' not in screenshot_config:
+                        self._clamp_full_page(screenshot_config)
                     self.page.screenshot(**screenshot_config)
                 
-                # 验证截图文件
-                if file_path.exists() and file_path.stat().st_size > 0:
+                # 验证截图文件（文件不存在时 os.stat 抛出异常，同样进入重试）
+                if os.stat(file_path).st_size > 0:
                     # 记录日志
                     desc_str = f" - {description}" if description else ""
-                    logger.info(f"📸 截图已保存: {file_path}{desc_str} (质量: {quality})")
-                    return str(file_path)
+                    quality_str = f"质量: {quality}" if use_jpeg else "PNG"
+                    logger.info(f"📸 截图已保存: {file_path}{desc_str} ({quality_str})")
+                    return file_path
                 else:
                     raise Exception("截图文件为空或不存在")
                     
             except Exception as e:
                 logger.warning(f"截图尝试 {attempt + 1}/{max_retries} 失败: {str(e)}")
-                if attempt == max_retries - 1:
+                # 除超时外的 Playwright 错误（如页面已关闭、选择器无效）重试也不会成功，直接放弃
+                non_retryable = isinstance(e, PlaywrightError) and not isinstance(e, PlaywrightTimeoutError)
+                if non_retryable or attempt == max_retries - 1:
                     logger.error(f"截图最终失败: {str(e)}")
-                    return None
-                # 短暂等待后重试
-                import time
-                time.sleep(0.5)
+                    break
+                # 指数退避后重试（最长1秒）
+                time.sleep(min(0.1 * 2 ** attempt, 1.0))
         
+        # 截图失败：删除占位文件或不完整的截图文件
+        _unlink_quietly(file_path)
         return None
     
-    def _get_unique_filepath(self, filename: str) -> Path:
-        """获取唯一的文件路径，避免冲突"""
-        base_path: Path = self.base_path / filename
-        if not base_path.exists():
-            return base_path
+    def _clamp_full_page(self, screenshot_config: Dict[str, Any]) -> None:
+        """超长页面的整页截图只截取顶部区域，减少光栅化和编码的像素量
         
-        # 文件已存在，添加序号
-        name_parts: list[str] = filename.rsplit('.', 1)
-        base_name: str = name_parts[0]
-        extension: str = name_parts[1] if len(name_parts) > 1 else 'png'
+        Args:
+            screenshot_config: 截图配置，需要裁剪时写入 clip
+        """
+        viewport = self.page.viewport_size
+        if not self.full_page_max_multiplier or not viewport:
+            return
         
-        counter: int = 1
-        while True:
-            new_filename: str = f"{base_name}_{counter}.{extension}"
-            new_path: Path = self.base_path / new_filename
-            if not new_path.exists():
-                return new_path
-            counter += 1
-            if counter > 1000:  # 防止无限循环
-                return self.base_path / f"{base_name}_{datetime.now().strftime('%f')}.{extension}"
+        max_height = int(viewport['height'] * self.full_page_max_multiplier)
+        page_height = self.page.evaluate("document.documentElement.scrollHeight")
+        if page_height > max_height:
+            screenshot_config['clip'] = {
+                'x': 0,
+                'y': 0,
+                'width': viewport['width'],
+                'height': max_height
+            }
+            logger.debug(f"页面高度 {page_height}px 超过整页截图上限，只截取顶部 {max_height}px")
+    
+    def _get_unique_filepath(self, filename: str) -> str:
+        """获取唯一的文件路径，避免冲突
+        
+        首选路径以 O_CREAT|O_EXCL 原子地创建占位文件，多个 xdist worker 同时
+        使用同一文件名时只有一个能成功；其余的由 mkstemp 创建带随机后缀的新文件。
+        
+        Args:
+            filename: 截图文件名（含扩展名）
+            
+        Returns:
+            已创建占位文件的截图路径
+        """
+        file_path: str = self._base_prefix + filename
+        try:
+            fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            # 文件已存在，由 mkstemp 原子地创建带随机后缀的新文件，无需逐个探测序号
+            base_name, _, extension = filename.rpartition('.')
+            if not base_name:
+                base_name, extension = filename, 'png'
+            fd, path = tempfile.mkstemp(prefix=f"{base_name}_", suffix=f".{extension}", dir=self.base_path)
+            os.close(fd)
+            # mkstemp 创建的文件权限为 0600，与其他截图保持一致
+            os.chmod(path, 0o644)
+            return self._base_prefix + os.path.basename(path)
+        os.close(fd)
+        return file_path
     
-    def take_failure_screenshot(self, test_name: str, error_msg: str = "") -> Optional[str]:
+    def take_failure_screenshot(
+        self,
+        test_name: str,
+        error_msg: str = "",
+        viewport_only: bool = True,
+        timestamp: Optional[str] = None
+    ) -> Optional[str]:
         """
         截取失败测试的截图
         
         Args:
             test_name: 测试名称
             error_msg: 错误信息
+            viewport_only: 是否只截取当前视口，为 False 时截取整个页面
+            timestamp: 文件名中的时间戳，为空时取当前时间（可由调用方传入以复用）
             
         Returns:
             截图文件路径
         """
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"failed_{test_name}_{timestamp}.png"
+        if timestamp is None:
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = f"failed_{test_name}_{timestamp}"
         
         description = f"测试失败截图 - {test_name}"
         if error_msg:
@@ -171,30 +271,41 @@ class ScreenshotHelper:
         return self.take_screenshot(
             filename=filename,
             description=description,
-            full_page=True
+            full_page=not viewport_only,
+            quality=self.FORMAT_POLICY_QUALITY['balanced']
         )
     
-    def take_step_screenshot(self, step_name: str, step_number: int = 0) -> Optional[str]:
+    def take_step_screenshot(
+        self,
+        step_name: str,
+        step_number: int = 0,
+        viewport_only: bool = True,
+        timestamp: Optional[str] = None
+    ) -> Optional[str]:
         """
         截取测试步骤截图
         
         Args:
             step_name: 步骤名称
             step_number: 步骤编号
+            viewport_only: 是否只截取当前视口，为 False 时截取整个页面
+            timestamp: 文件名中的时间戳，为空时取当前时间（可由调用方传入以复用）
             
         Returns:
             截图文件路径
         """
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        if timestamp is None:
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         step_prefix = f"step{step_number:02d}_" if step_number > 0 else "step_"
-        filename = f"{step_prefix}{step_name}_{timestamp}.png"
+        filename = f"{step_prefix}{step_name}_{timestamp}"
         
         description = f"测试步骤截图 - {step_name}"
         
         return self.take_screenshot(
             filename=filename,
             description=description,
-            full_page=True
+            full_page=not viewport_only,
+            quality=self.FORMAT_POLICY_QUALITY['speed']
         )
     
     def take_element_screenshot(
@@ -216,8 +327,9 @@ class ScreenshotHelper:
         """
         if not filename:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            element_name = element_selector.replace(' ', '_').replace('>', '_')
-            filename = f"element_{element_name}_{timestamp}.png"
+            # 单次转换替换非法字符，并限制长度以免超出 Windows 路径限制
+            element_name = element_selector.translate(_SELECTOR_TRANS)[:64]
+            filename = f"element_{element_name}_{timestamp}"
         
         if not description:
             description = f"元素截图 - {element_selector}"
@@ -225,7 +337,8 @@ class ScreenshotHelper:
         return self.take_screenshot(
             filename=filename,
             description=description,
-            element_selector=element_selector
+            element_selector=element_selector,
+            quality=self.FORMAT_POLICY_QUALITY['quality']
         )
     
     def take_comparison_screenshots(
@@ -245,12 +358,11 @@ class ScreenshotHelper:
         Returns:
             (操作前截图路径, 操作后截图路径)
         """
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        
+        # 操作前后截图共用同一时间戳
         timestamp: str = datetime.now().strftime('%Y%m%d_%H%M%S')
         
         # 操作前截图
-        before_filename: str = f"before_{action_name}_{timestamp}.png"
+        before_filename: str = f"before_{action_name}_{timestamp}"
         before_path: Optional[str] = self.take_screenshot(
             filename=before_filename,
             description=f"操作前截图 - {action_name}"
@@ -261,7 +373,7 @@ class ScreenshotHelper:
             before_action()
         
         # 操作后截图
-        after_filename: str = f"after_{action_name}_{timestamp}.png"
+        after_filename: str = f"after_{action_name}_{timestamp}"
         after_path: Optional[str] = self.take_screenshot(
             filename=after_filename,
             description=f"操作后截图 - {action_name}"
@@ -287,43 +399,41 @@ class ScreenshotHelper:
         try:
             from datetime import timedelta
             deleted_count = 0
-            cutoff_time = datetime.now() - timedelta(days=days)
+            cutoff = (datetime.now() - timedelta(days=days)).timestamp()
             
-            # 获取所有截图文件信息
+            # 单次扫描目录获取所有截图文件信息 (修改时间, 大小, 路径)
             files_info = []
             total_size = 0
             
-            for pattern in ["*.png", "*.jpg", "*.jpeg"]:
-                for file_path in self.base_path.glob(pattern):
-                    if file_path.is_file():
-                        stat = file_path.stat()
-                        files_info.append({
-                            'path': file_path,
-                            'mtime': stat.st_mtime,
-                            'size': stat.st_size
-                        })
+            with os.scandir(self.base_path) as entries:
+                for entry in entries:
+                    if entry.name.endswith(_KNOWN_EXT) and entry.is_file():
+                        stat = entry.stat()
+                        files_info.append((stat.st_mtime, stat.st_size, entry.path))
                         total_size += stat.st_size
             
-            # 按修改时间排序（旧的在前）
-            files_info.sort(key=lambda x: x['mtime'])
+            # 按修改时间排序（旧的在前），待删除文件即为列表前缀
+            files_info.sort()
+            index = 0
             
-            # 删除过期文件
-            for file_info in files_info[:]:
-                if file_info['mtime'] < cutoff_time.timestamp():
-                    file_info['path'].unlink()
-                    files_info.remove(file_info)
-                    deleted_count += 1
-                    total_size -= file_info['size']
-                    logger.debug(f"删除过期截图: {file_info['path']}")
+            # 过期文件
+            while index < len(files_info) and files_info[index][0] < cutoff:
+                total_size -= files_info[index][1]
+                index += 1
+            expired_count = index
             
-            # 如果目录仍然过大，删除最旧的文件
+            # 如果目录仍然过大，继续删除最旧的文件
             max_size_bytes = max_size_mb * 1024 * 1024
-            while total_size > max_size_bytes and files_info:
-                oldest_file = files_info.pop(0)
-                oldest_file['path'].unlink()
-                deleted_count += 1
-                total_size -= oldest_file['size']
-                logger.debug(f"删除旧截图(空间限制): {oldest_file['path']}")
+            while total_size > max_size_bytes and index < len(files_info):
+                total_size -= files_info[index][1]
+                index += 1
+            
+            # 并行删除，在高延迟文件系统（网络存储、CI挂载目录）上重叠 I/O 等待
+            if index:
+                paths = [path for _, _, path in files_info[:index]]
+                with ThreadPoolExecutor(max_workers=min(16, index)) as executor:
+                    deleted_count = sum(executor.map(_unlink_quietly, paths))
+                logger.debug(f"删除过期截图 {expired_count} 个，因空间限制删除 {index - expired_count} 个")
             
             if deleted_count > 0:
                 logger.info(f"清理完成，删除了 {deleted_count} 个截图文件，当前目录大小: {(total_size / 1024 / 1024):.1f}MB")
@@ -342,20 +452,21 @@ class ScreenshotHelper:
             file_path: 截图文件路径
             
         Returns:
-            截图信息字典
+            截图信息字典，时间字段为时间戳（秒），文件不存在时返回空字典
         """
         try:
-            path: Path = Path(file_path)
-            if not path.exists():
+            # 单次 stat 同时完成存在性检查和信息读取
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
                 return {}
             
-            stat = path.stat()
             return {
-                'filename': path.name,
+                'filename': os.path.basename(file_path),
                 'size': stat.st_size,
-                'created_time': datetime.fromtimestamp(stat.st_ctime),
-                'modified_time': datetime.fromtimestamp(stat.st_mtime),
-                'absolute_path': str(path.absolute())
+                'created_time': stat.st_ctime,
+                'modified_time': stat.st_mtime,
+                'absolute_path': os.path.abspath(file_path)
             }
             
         except Exception as e:
@@ -7,17 +7,26 @@
 4. 环境变量和配置管理
 5. 数据过滤和查询功能
 """
+import csv
+import hashlib
 import json
 import os
-import pandas as pd
+import tempfile
+import zipfile
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Set, Tuple, Union
 from loguru import logger
 from dataclasses import dataclass
 from enum import Enum
 import re
+import sys
 import jsonschema
-from jsonschema import validate, ValidationError
+from jsonschema import ValidationError
+from jsonschema.validators import validator_for
+
+
+class _EmptyCSVError(Exception):
+    """CSV文件没有表头"""
 
 
 class DataFormat(Enum):
@@ -27,7 +36,11 @@ class DataFormat(Enum):
     CSV = "csv"
 
 
-@dataclass
+# dataclass(slots=True) 需要 Python 3.10+，更低版本退回普通 dataclass
+_DATACLASS_SLOTS: Dict[str, bool] = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class TestUser:
     """测试用户数据类"""
     username: str
@@ -39,20 +52,115 @@ class TestUser:
     description: str = ""
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class TestData:
     """测试数据基类"""
     id: str
     name: str
     description: str
     data: Dict[str, Any]
-    tags: List[str] = None
+    tags: Optional[List[str]] = None
     
     def __post_init__(self):
         if self.tags is None:
             self.tags = []
 
 
+# 解析结果的磁盘缓存目录，与截图、录像等运行产物一同放在 reports 下，不写入数据目录
+_DISK_CACHE_DIR = Path("reports") / ".cache" / "testdata"
+
+
+# 环境变量模式 ${VAR_NAME} 或 $VAR_NAME
+_ENV_VAR_RE = re.compile(r'\$\{([^}]+)\}|\$([A-Za-z_][A-Za-z0-9_]*)')
+
+
+def _replace_env_var(match: re.Match) -> str:
+    """将匹配到的环境变量替换为其值，未设置时保留原文"""
+    var_name = match.group(1) or match.group(2)
+    return os.getenv(var_name, match.group(0))
+
+
+# 数据验证模式
+_VALIDATION_SCHEMAS = {
+    "users": {
+        "type": "object",
+        "properties": {
+            "users": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "username": {"type": "string", "minLength": 1},
+                        "password": {"type": "string", "minLength": 1},
+                        "name": {"type": "string"},
+                        "email": {"type": "string", "format": "email"},
+                        "role": {"type": "string", "enum": ["admin", "user", "manager"]},
+                        "status": {"type": "string", "enum": ["active", "inactive"]}
+                    },
+                    "required": ["username", "password", "name", "email", "role"]
+                }
+            }
+        },
+        "required": ["users"]
+    },
+    "config": {
+        "type": "object",
+        "properties": {
+            "urls": {
+                "type": "object",
+                "patternProperties": {
+                    ".*": {
+                        "type": "object",
+                        "properties": {
+                            "base_url": {"type": "string"}
+                        }
+                    }
+                }
+            }
+        }
+    }
+}
+
+# Excel各工作表的必要列
+_REQUIRED_COLS = {
+    'Users': frozenset(['username', 'password', 'name', 'email', 'role']),
+    'FormData': frozenset(['test_case', 'name', 'username', 'email', 'password', 'role']),
+    'ApprovalData': frozenset(['request_id', 'requester', 'request_type', 'status', 'priority']),
+    'LoginScenarios': frozenset(['scenario', 'username', 'password', 'expected_result'])
+}
+
+# 取值高度重复的枚举类字段，加载后驻留其字符串
+_ENUM_KEYS = frozenset(['role', 'status', 'request_type', 'priority'])
+
+
+def _intern_enum_values(data: Any):
+    """
+    驻留记录列表中枚举类字段的字符串值，使重复取值共享同一对象
+    
+    Args:
+        data: 加载后的数据，仅处理顶层各键下的字典列表
+    """
+    if not isinstance(data, dict):
+        return
+    for records in data.values():
+        if not isinstance(records, list):
+            continue
+        for item in records:
+            if not isinstance(item, dict):
+                continue
+            for key in _ENUM_KEYS.intersection(item):
+                value = item[key]
+                if type(value) is str:
+                    item[key] = sys.intern(value)
+
+
+# 由验证模式预先构建的验证器，所有实例共享，避免每次验证都重新检查模式
+_VALIDATORS = {
+    key: validator_for(schema)(schema)
+    for key, schema in _VALIDATION_SCHEMAS.items()
+}
+
+
 class TestDataManager:
     """测试数据管理器"""
     
@@ -67,18 +175,21 @@ class TestDataManager:
         self.data_dir.mkdir(exist_ok=True)
         
         # 数据缓存
-        self._cache = {}
-        self._users_cache = {}
-        self._config_cache = {}
-        
-        # 数据验证模式
+        self._cache: Dict[Path, Dict[str, Any]] = {}
+        self._users_cache: Dict[Tuple[str, Optional[str], Optional[str]], List[TestUser]] = {}
+        self._config_cache: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._keys_by_file: Dict[str, Set[tuple]] = {}  # 文件名 -> 用户和配置缓存键
+        self._user_indexes: Dict[str, Dict[str, Any]] = {}
+        self._username_index: Dict[str, Dict[str, TestUser]] = {}
+        
+        # 数据验证模式及预先构建的验证器（模块级共享）
         self._validation_schemas = self._load_validation_schemas()
+        self._validators = _VALIDATORS
         
         # 支持的文件格式
         self.supported_formats = {
             '.json': self._load_json,
             '.xlsx': self._load_excel,
-            '.xls': self._load_excel,
             '.csv': self._load_csv
         }
         
@@ -89,46 +200,7 @@ class TestDataManager:
     
     def _load_validation_schemas(self) -> Dict[str, Dict]:
         """加载数据验证模式"""
-        schemas = {
-            "users": {
-                "type": "object",
-                "properties": {
-                    "users": {
-                        "type": "array",
-                        "items": {
-                            "type": "object",
-                            "properties": {
-                                "username": {"type": "string", "minLength": 1},
-                                "password": {"type": "string", "minLength": 1},
-                                "name": {"type": "string"},
-                                "email": {"type": "string", "format": "email"},
-                                "role": {"type": "string", "enum": ["admin", "user", "manager"]},
-                                "status": {"type": "string", "enum": ["active", "inactive"]}
-                            },
-                            "required": ["username", "password", "name", "email", "role"]
-                        }
-                    }
-                },
-                "required": ["users"]
-            },
-            "config": {
-                "type": "object",
-                "properties": {
-                    "urls": {
-                        "type": "object",
-                        "patternProperties": {
-                            ".*": {
-                                "type": "object",
-                                "properties": {
-                                    "base_url": {"type": "string"}
-                                }
-                            }
-                        }
-                    }
-                }
-            }
-        }
-        return schemas
+        return _VALIDATION_SCHEMAS
     
     def _validate_core_files(self):
         """验证核心数据文件的完整性"""
@@ -145,16 +217,16 @@ class TestDataManager:
                 
             try:
                 data = self._load_json(file_path)
-                if data and schema_key in self._validation_schemas:
-                    self._validate_data(data, self._validation_schemas[schema_key], filename)
+                if data and schema_key in self._validators:
+                    self._validate_data(data, self._validators[schema_key], filename)
                     logger.info(f"数据文件验证通过: {filename}")
             except Exception as e:
                 logger.error(f"验证数据文件失败 {filename}: {e}")
     
-    def _validate_data(self, data: Dict, schema: Dict, source: str = "unknown"):
+    def _validate_data(self, data: Dict, validator: jsonschema.protocols.Validator, source: str = "unknown"):
         """验证数据格式"""
         try:
-            validate(instance=data, schema=schema)
+            validator.validate(data)
         except ValidationError as e:
             error_msg = f"数据验证失败 ({source}): {e.message}"
             logger.error(error_msg)
@@ -167,15 +239,16 @@ class TestDataManager:
     def _load_json(self, file_path: Path) -> Dict[str, Any]:
         """加载JSON文件"""
         try:
-            if not file_path.exists():
+            # 一次性读取原始字节交给解析器，省去文本流的逐块解码
+            try:
+                raw = file_path.read_bytes()
+            except FileNotFoundError:
                 raise FileNotFoundError(f"文件不存在: {file_path}")
+            data = json.loads(raw)
                 
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                
-            # 验证文件大小（防止过大文件）
-            if file_path.stat().st_size > 10 * 1024 * 1024:  # 10MB
-                logger.warning(f"数据文件过大: {file_path} ({file_path.stat().st_size} bytes)")
+            # 验证文件大小（防止过大文件），直接使用已读取的字节数
+            if len(raw) > 10 * 1024 * 1024:  # 10MB
+                logger.warning(f"数据文件过大: {file_path} ({len(raw)} bytes)")
                 
             logger.debug(f"成功加载JSON文件: {file_path}")
             return data
@@ -195,39 +268,65 @@ class TestDataManager:
     
     def _load_excel(self, file_path: Path) -> Dict[str, Any]:
         """加载Excel文件"""
+        # 仅在实际读取Excel时才导入openpyxl，只使用JSON数据时无需承担其导入开销
+        import openpyxl
+        from openpyxl.utils.exceptions import InvalidFileException
+        
         try:
-            if not file_path.exists():
+            try:
+                file_size = file_path.stat().st_size
+            except FileNotFoundError:
                 raise FileNotFoundError(f"Excel文件不存在: {file_path}")
             
             # 验证文件扩展名
-            if file_path.suffix.lower() not in ['.xlsx', '.xls']:
-                raise ValueError(f"不支持的Excel文件格式: {file_path.suffix}")
+            # openpyxl 不支持旧版 .xls 格式
+            if file_path.suffix.lower() != '.xlsx':
+                raise ValueError(f"不支持的Excel文件格式: {file_path.suffix}（仅支持.xlsx，请将.xls另存为.xlsx）")
             
             # 验证文件大小
-            file_size = file_path.stat().st_size
             if file_size > 50 * 1024 * 1024:  # 50MB
                 raise ValueError(f"Excel文件过大: {file_size} bytes (最大支持50MB)")
             
-            # 读取所有工作表
-            excel_data = pd.read_excel(file_path, sheet_name=None)
-            
-            if not excel_data:
-                raise ValueError(f"Excel文件为空或无法读取: {file_path}")
-            
-            # 转换为字典格式
+            # 以只读模式逐行读取所有工作表，避免构建完整的DataFrame
             result = {}
-            for sheet_name, df in excel_data.items():
-                if df.empty:
-                    logger.warning(f"工作表 '{sheet_name}' 为空")
-                    result[sheet_name] = []
-                else:
+            workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+            try:
+                for worksheet in workbook.worksheets:
+                    sheet_name = worksheet.title
+                    rows = worksheet.iter_rows(values_only=True)
+                    header_row = next(rows, None)
+                    if header_row is None:
+                        logger.warning(f"工作表 '{sheet_name}' 为空")
+                        result[sheet_name] = []
+                        continue
+                    
+                    header = [
+                        f"Unnamed: {index}" if column is None else column
+                        for index, column in enumerate(header_row)
+                    ]
+                    
+                    # 跳过空行，并将空单元格转换为空字符串
+                    records = [
+                        {column: '' if value is None else value for column, value in zip(header, row)}
+                        for row in rows
+                        if any(value is not None for value in row)
+                    ]
+                    
+                    if not records:
+                        logger.warning(f"工作表 '{sheet_name}' 为空")
+                        result[sheet_name] = []
+                        continue
+                    
                     # 检查必要的列
                     if sheet_name in ['Users', 'FormData', 'ApprovalData']:
-                        self._validate_excel_sheet(df, sheet_name)
+                        self._validate_excel_sheet(header, len(records), sheet_name)
                     
-                    # 将DataFrame转换为字典列表，处理NaN值
-                    records = df.fillna('').to_dict('records')
                     result[sheet_name] = records
+            finally:
+                workbook.close()
+            
+            if not result:
+                raise ValueError(f"Excel文件为空或无法读取: {file_path}")
             
             logger.debug(f"成功加载Excel文件: {file_path}, 工作表: {list(result.keys())}")
             return result
@@ -235,10 +334,7 @@ class TestDataManager:
         except FileNotFoundError as e:
             logger.error(f"Excel文件不存在: {file_path}")
             raise e
-        except pd.errors.EmptyDataError:
-            logger.error(f"Excel文件为空: {file_path}")
-            raise ValueError(f"Excel文件为空: {file_path}")
-        except pd.errors.ParserError as e:
+        except (InvalidFileException, zipfile.BadZipFile) as e:
             logger.error(f"Excel文件解析错误: {file_path}, 错误: {e}")
             raise ValueError(f"Excel文件格式错误: {e}")
         except PermissionError as e:
@@ -248,17 +344,19 @@ class TestDataManager:
             logger.error(f"加载Excel文件失败: {file_path}, 错误: {e}")
             raise e
     
-    def _validate_excel_sheet(self, df: pd.DataFrame, sheet_name: str):
-        """验证Excel工作表结构"""
-        required_columns = {
-            'Users': ['username', 'password', 'name', 'email', 'role'],
-            'FormData': ['test_case', 'name', 'username', 'email', 'password', 'role'],
-            'ApprovalData': ['request_id', 'requester', 'request_type', 'status', 'priority'],
-            'LoginScenarios': ['scenario', 'username', 'password', 'expected_result']
-        }
+    def _validate_excel_sheet(self, header: List[str], row_count: int, sheet_name: str):
+        """
+        验证Excel工作表结构
+        
+        Args:
+            header: 表头列名列表
+            row_count: 数据行数
+            sheet_name: 工作表名称
+        """
+        required_columns = _REQUIRED_COLS.get(sheet_name)
         
-        if sheet_name in required_columns:
-            missing_columns = set(required_columns[sheet_name]) - set(df.columns)
+        if required_columns is not None:
+            missing_columns = set(required_columns.difference(header))
             if missing_columns:
                 if sheet_name == 'LoginScenarios':
                     logger.warning(f"工作表 '{sheet_name}' 缺少推荐列: {missing_columns}")
@@ -266,15 +364,17 @@ class TestDataManager:
                     raise ValueError(f"工作表 '{sheet_name}' 缺少必要列: {missing_columns}")
             
             # 检查数据行数
-            if len(df) == 0:
+            if row_count == 0:
                 logger.warning(f"工作表 '{sheet_name}' 没有数据行")
-            elif len(df) > 1000:
-                logger.warning(f"工作表 '{sheet_name}' 数据行数过多: {len(df)} 行")
+            elif row_count > 1000:
+                logger.warning(f"工作表 '{sheet_name}' 数据行数过多: {row_count} 行")
     
     def _load_csv(self, file_path: Path) -> Dict[str, Any]:
         """加载CSV文件"""
         try:
-            if not file_path.exists():
+            try:
+                file_size = file_path.stat().st_size
+            except FileNotFoundError:
                 raise FileNotFoundError(f"CSV文件不存在: {file_path}")
             
             # 验证文件扩展名
@@ -282,29 +382,35 @@ class TestDataManager:
                 raise ValueError(f"不支持的CSV文件格式: {file_path.suffix}")
             
             # 验证文件大小
-            file_size = file_path.stat().st_size
             if file_size > 20 * 1024 * 1024:  # 20MB
                 raise ValueError(f"CSV文件过大: {file_size} bytes (最大支持20MB)")
             
-            df = pd.read_csv(file_path, encoding='utf-8')
+            # 逐行读取为字典，缺失的单元格转换为空字符串
+            with open(file_path, 'r', encoding='utf-8', newline='') as f:
+                reader = csv.DictReader(f)
+                if reader.fieldnames is None:
+                    raise _EmptyCSVError()
+                
+                records = []
+                for row in reader:
+                    if None in row:
+                        raise csv.Error(f"第 {reader.line_num} 行的字段数多于表头")
+                    records.append({key: value or '' for key, value in row.items()})
             
-            if df.empty:
+            if not records:
                 logger.warning(f"CSV文件为空: {file_path}")
                 return {"data": []}
             
-            # 处理NaN值并转换为字典列表
-            records = df.fillna('').to_dict('records')
-            
             logger.debug(f"成功加载CSV文件: {file_path}, 数据行数: {len(records)}")
             return {"data": records}
             
         except FileNotFoundError as e:
             logger.error(f"CSV文件不存在: {file_path}")
             raise e
-        except pd.errors.EmptyDataError:
+        except _EmptyCSVError:
             logger.error(f"CSV文件为空: {file_path}")
             raise ValueError(f"CSV文件为空: {file_path}")
-        except pd.errors.ParserError as e:
+        except csv.Error as e:
             logger.error(f"CSV文件解析错误: {file_path}, 错误: {e}")
             raise ValueError(f"CSV文件格式错误: {e}")
         except UnicodeDecodeError as e:
@@ -331,28 +437,129 @@ class TestDataManager:
         file_path = self.data_dir / filename
         
         # 检查缓存
-        if use_cache and str(file_path) in self._cache:
-            logger.debug(f"从缓存加载数据: {filename}")
-            return self._cache[str(file_path)]
+        if use_cache:
+            cached = self._cache.get(file_path)
+            if cached is not None:
+                logger.debug(f"从缓存加载数据: {filename}")
+                return cached
         
         # 检查文件是否存在
-        if not file_path.exists():
+        try:
+            stat_result = file_path.stat()
+        except FileNotFoundError:
             raise FileNotFoundError(f"数据文件不存在: {file_path}")
         
         # 根据文件扩展名选择加载方法
         file_ext = file_path.suffix.lower()
         if file_ext not in self.supported_formats:
+            if file_ext == '.xls':
+                raise ValueError(f"不支持的文件格式: {file_ext}（仅支持.xlsx，请将.xls另存为.xlsx）")
             raise ValueError(f"不支持的文件格式: {file_ext}")
         
-        # 加载数据
-        data = self.supported_formats[file_ext](file_path)
+        # 磁盘缓存本身为JSON格式，JSON数据文件直接解析即可，无需缓存
+        use_disk_cache = use_cache and file_ext != '.json'
+        
+        # 加载数据，优先使用与文件修改时间和大小匹配的磁盘缓存
+        data = None
+        if use_disk_cache:
+            disk_cache_path = self._disk_cache_path(file_path, stat_result)
+            data = self._load_disk_cache(disk_cache_path)
+            if data is not None:
+                logger.debug(f"从磁盘缓存加载数据: {filename}")
+        
+        if data is None:
+            data = self.supported_formats[file_ext](file_path)
+            if use_disk_cache:
+                self._save_disk_cache(disk_cache_path, data)
+        
+        _intern_enum_values(data)
         
         # 缓存数据
         if use_cache:
-            self._cache[str(file_path)] = data
+            self._cache[file_path] = data
         
         return data
     
+    def _disk_cache_path(self, file_path: Path, stat_result: os.stat_result) -> Path:
+        """
+        获取数据文件对应的磁盘缓存路径
+        
+        Args:
+            file_path: 数据文件路径
+            stat_result: 数据文件的stat结果
+            
+        Returns:
+            以文件路径摘要、修改时间和大小命名的缓存文件路径
+        """
+        digest = hashlib.md5(str(file_path.resolve()).encode('utf-8')).hexdigest()
+        return _DISK_CACHE_DIR / f"{digest}_{stat_result.st_mtime_ns}_{stat_result.st_size}.json"
+    
+    def _load_disk_cache(self, cache_path: Path) -> Optional[Dict[str, Any]]:
+        """
+        读取磁盘缓存
+        
+        缓存使用纯数据的JSON格式：缓存目录可能被其他用户或CI产物写入，
+        不能使用pickle等反序列化时可执行代码的格式。被篡改的缓存最多只会
+        影响测试数据本身，与直接修改数据文件的风险相同。
+        
+        Args:
+            cache_path: 缓存文件路径
+            
+        Returns:
+            缓存的数据，缓存不存在或损坏时返回None
+        """
+        try:
+            data = json.loads(cache_path.read_bytes())
+            return data if isinstance(data, dict) else None
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.debug(f"磁盘缓存不可用，将重新解析: {cache_path}, 错误: {e}")
+            return None
+    
+    def _save_disk_cache(self, cache_path: Path, data: Dict[str, Any]):
+        """
+        原子写入磁盘缓存，并清理同一数据文件的旧缓存
+        
+        只缓存能以JSON无损往返的数据（如包含日期等类型或非字符串键时不缓存）
+        
+        Args:
+            cache_path: 缓存文件路径
+            data: 解析后的数据
+        """
+        cache_dir = cache_path.parent
+        prefix = cache_path.name.split('_', 1)[0] + '_'
+        try:
+            payload = json.dumps(data, ensure_ascii=False)
+            if json.loads(payload) != data:
+                logger.debug(f"数据无法以JSON无损缓存，跳过磁盘缓存: {cache_path}")
+                return
+        except (TypeError, ValueError) as e:
+            logger.debug(f"数据无法以JSON缓存，跳过磁盘缓存: {cache_path}, 错误: {e}")
+            return
+        
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(payload)
+                os.replace(tmp_path, cache_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            
+            # 数据文件修改后旧缓存不会再命中，直接删除
+            with os.scandir(cache_dir) as entries:
+                for entry in entries:
+                    if entry.name.startswith(prefix) and entry.name != cache_path.name:
+                        try:
+                            os.unlink(entry.path)
+                        except OSError:
+                            pass
+        except Exception as e:
+            logger.debug(f"写入磁盘缓存失败: {cache_path}, 错误: {e}")
+    
     def get_users(self, filename: str = "users.json", role: str = None, status: str = None) -> List[TestUser]:
         """
         获取用户数据
@@ -365,35 +572,65 @@ class TestDataManager:
         Returns:
             用户列表
         """
-        cache_key = f"{filename}_{role}_{status}"
+        cache_key = (filename, role, status)
         
         # 检查缓存
-        if cache_key in self._users_cache:
-            return self._users_cache[cache_key]
-        
-        # 加载用户数据
-        data = self.load_data_file(filename)
-        users_data = data.get('users', [])
-        
-        # 转换为TestUser对象
-        users = []
-        for user_data in users_data:
-            user = TestUser(**user_data)
-            
-            # 应用过滤条件
-            if role and user.role != role:
-                continue
-            if status and user.status != status:
-                continue
-                
-            users.append(user)
+        cached = self._users_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        indexes = self._get_user_indexes(filename)
+        
+        # 应用过滤条件：同时指定角色和状态时，从较小的索引列表中筛选
+        if role and status:
+            by_role = indexes['by_role'].get(role, [])
+            by_status = indexes['by_status'].get(status, [])
+            if len(by_role) <= len(by_status):
+                users = [user for user in by_role if user.status == status]
+            else:
+                users = [user for user in by_status if user.role == role]
+        elif role:
+            users = indexes['by_role'].get(role, [])
+        elif status:
+            users = indexes['by_status'].get(status, [])
+        else:
+            users = indexes['all']
         
         # 缓存结果
         self._users_cache[cache_key] = users
+        self._keys_by_file.setdefault(filename, set()).add(cache_key)
         
         logger.debug(f"加载用户数据: {len(users)} 个用户")
         return users
     
+    def _get_user_indexes(self, filename: str) -> Dict[str, Any]:
+        """
+        获取用户数据索引，首次访问时加载文件并按角色和状态建立索引
+        
+        Args:
+            filename: 用户数据文件名
+            
+        Returns:
+            包含全部用户列表及角色、状态索引的字典
+        """
+        indexes = self._user_indexes.get(filename)
+        if indexes is not None:
+            return indexes
+        
+        # 加载用户数据并转换为TestUser对象
+        data = self.load_data_file(filename)
+        all_users = [TestUser(**user_data) for user_data in data.get('users', [])]
+        
+        by_role: Dict[str, List[TestUser]] = {}
+        by_status: Dict[str, List[TestUser]] = {}
+        for user in all_users:
+            by_role.setdefault(user.role, []).append(user)
+            by_status.setdefault(user.status, []).append(user)
+        
+        indexes = {'all': all_users, 'by_role': by_role, 'by_status': by_status}
+        self._user_indexes[filename] = indexes
+        return indexes
+    
     def get_user_by_username(self, username: str, filename: str = "users.json") -> Optional[TestUser]:
         """
         根据用户名获取用户
@@ -413,18 +650,22 @@ class TestDataManager:
             raise ValueError("用户名不能为空白字符")
         
         try:
-            users = self.get_users(filename)
-            
-            if not users:
+            index = self._username_index.get(filename)
+            if index is None:
+                # 按用户名建立索引，重名时保留第一个用户
+                index = {}
+                for user in self.get_users(filename):
+                    index.setdefault(user.username, user)
+                self._username_index[filename] = index
+            
+            if not index:
                 logger.warning(f"用户数据文件 {filename} 中没有用户数据")
                 return None
             
-            for user in users:
-                if user.username == username:
-                    return user
-            
-            logger.warning(f"未找到用户: {username}")
-            return None
+            user = index.get(username)
+            if user is None:
+                logger.warning(f"未找到用户: {username}")
+            return user
             
         except Exception as e:
             logger.error(f"获取用户信息时发生错误: {e}")
@@ -474,16 +715,11 @@ class TestDataManager:
         
         # 应用过滤条件
         if filters:
-            filtered_data = []
-            for item in test_data:
-                match = True
-                for key, value in filters.items():
-                    if key not in item or item[key] != value:
-                        match = False
-                        break
-                if match:
-                    filtered_data.append(item)
-            test_data = filtered_data
+            conditions = tuple(filters.items())
+            test_data = [
+                item for item in test_data
+                if all(key in item and item[key] == value for key, value in conditions)
+            ]
         
         logger.debug(f"获取测试数据: {data_type}, 数量: {len(test_data)}")
         return test_data
@@ -499,20 +735,22 @@ class TestDataManager:
         Returns:
             配置字典
         """
-        cache_key = f"{filename}_{config_name}"
+        cache_key = (filename, config_name)
         
         # 检查缓存
-        if cache_key in self._config_cache:
-            return self._config_cache[cache_key]
+        cached = self._config_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
         data = self.load_data_file(filename)
         config = data.get(config_name, {})
         
-        # 处理环境变量替换
+        # 处理环境变量替换（同时复制配置，调用方修改返回值不影响文件数据缓存）
         config = self._resolve_env_variables(config)
         
         # 缓存配置
         self._config_cache[cache_key] = config
+        self._keys_by_file.setdefault(filename, set()).add(cache_key)
         
         return config
     
@@ -527,14 +765,10 @@ class TestDataManager:
             解析后的数据
         """
         if isinstance(data, str):
-            # 查找环境变量模式 ${VAR_NAME} 或 $VAR_NAME
-            pattern = r'\$\{([^}]+)\}|\$([A-Za-z_][A-Za-z0-9_]*)'
-            
-            def replace_env_var(match):
-                var_name = match.group(1) or match.group(2)
-                return os.getenv(var_name, match.group(0))
-            
-            return re.sub(pattern, replace_env_var, data)
+            # 不含 '$' 的字符串无需进入正则匹配
+            if '$' not in data:
+                return data
+            return _ENV_VAR_RE.sub(_replace_env_var, data)
         
         elif isinstance(data, dict):
             return {key: self._resolve_env_variables(value) for key, value in data.items()}
@@ -614,6 +848,9 @@ class TestDataManager:
         self._cache.clear()
         self._users_cache.clear()
         self._config_cache.clear()
+        self._keys_by_file.clear()
+        self._user_indexes.clear()
+        self._username_index.clear()
         logger.info("测试数据缓存已清空")
     
     def reload_data(self, filename: str = None):
@@ -625,24 +862,15 @@ class TestDataManager:
         """
         if filename:
             # 清除指定文件的缓存
-            file_path = str(self.data_dir / filename)
-            if file_path in self._cache:
-                del self._cache[file_path]
-            
-            # 清除相关的用户和配置缓存
-            keys_to_remove = []
-            for key in self._users_cache.keys():
-                if key.startswith(filename):
-                    keys_to_remove.append(key)
-            for key in keys_to_remove:
-                del self._users_cache[key]
-            
-            keys_to_remove = []
-            for key in self._config_cache.keys():
-                if key.startswith(filename):
-                    keys_to_remove.append(key)
-            for key in keys_to_remove:
-                del self._config_cache[key]
+            self._cache.pop(self.data_dir / filename, None)
+            
+            # 清除相关的用户和配置缓存（两类缓存键长度不同，不会互相冲突）
+            for key in self._keys_by_file.pop(filename, ()):
+                self._users_cache.pop(key, None)
+                self._config_cache.pop(key, None)
+            
+            self._user_indexes.pop(filename, None)
+            self._username_index.pop(filename, None)
             
             logger.info(f"重新加载数据文件: {filename}")
         else:
@@ -675,16 +903,18 @@ class TestDataManager:
         """
         file_path = self.data_dir / filename
         
-        if not file_path.exists():
+        try:
+            stat_result = file_path.stat()
+        except FileNotFoundError:
             raise FileNotFoundError(f"数据文件不存在: {file_path}")
         
         info = {
             'filename': filename,
             'path': str(file_path),
-            'size': file_path.stat().st_size,
-            'modified': file_path.stat().st_mtime,
+            'size': stat_result.st_size,
+            'modified': stat_result.st_mtime,
             'format': file_path.suffix.lower(),
-            'cached': str(file_path) in self._cache
+            'cached': file_path in self._cache
         }
         
         # 尝试获取数据结构信息
@@ -700,5 +930,15 @@ class TestDataManager:
         return info
 
 
-# 全局测试数据管理器实例
-test_data_manager = TestDataManager()
\ No newline at end of file
+# 全局测试数据管理器实例（首次访问 test_data_manager 时才创建）
+_instance: Optional[TestDataManager] = None
+
+
+def __getattr__(name: str) -> Any:
+    """延迟创建全局实例，导入模块时不触发目录创建和数据文件校验"""
+    global _instance
+    if name == 'test_data_manager':
+        if _instance is None:
+            _instance = TestDataManager()
+        return _instance
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
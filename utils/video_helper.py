@@ -1,13 +1,61 @@
 """视频录制助手工具"""
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Dict, Any, Set, Union, List
+from typing import Optional, Dict, Any, Set, Union, List, BinaryIO
 from playwright.sync_api import Page, BrowserContext
 from loguru import logger
+from config.playwright_config import VIDEO_SIZE_CONFIG
+from utils.file_helper import ensure_dir
 import subprocess
 
 
+# 按秒缓存的时间戳字符串，同一秒内生成多个文件名时复用
+_last_ts_sec: int = 0
+_last_ts_str: str = ''
+
+
+def _timestamp() -> str:
+    """获取 '%Y%m%d_%H%M%S' 格式的当前时间戳，同一秒内复用已格式化的结果"""
+    global _last_ts_sec, _last_ts_str
+    seconds = int(time.time())
+    if seconds != _last_ts_sec:
+        _last_ts_sec = seconds
+        _last_ts_str = time.strftime('%Y%m%d_%H%M%S', time.localtime(seconds))
+    return _last_ts_str
+
+
+def wait_until_stable(path: Union[str, Path], timeout: float = 2.0, poll: float = 0.05) -> bool:
+    """
+    等待文件写入完成：按间隔采样文件大小，连续两次一致即视为写入完成
+    
+    Args:
+        path: 文件路径
+        timeout: 最长等待时间（秒）
+        poll: 采样间隔（秒）
+        
+    Returns:
+        文件存在且大小已稳定时返回True，超时返回False
+    """
+    deadline = time.monotonic() + timeout
+    last_size = None
+    while True:
+        try:
+            size = os.stat(path).st_size
+        except OSError:
+            size = None
+        
+        if size and size == last_size:
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        
+        last_size = size
+        time.sleep(poll)
+
+
 class VideoHelper:
     """视频录制助手类"""
     
@@ -21,11 +69,11 @@ class VideoHelper:
         """
         self.context: BrowserContext = context
         self.base_path: Path = Path(base_path)
-        self.base_path.mkdir(parents=True, exist_ok=True)
+        ensure_dir(self.base_path)
         
         # 视频录制配置
         self.default_config: Dict[str, Any] = {
-            'size': {'width': 1920, 'height': 1080},
+            'size': dict(VIDEO_SIZE_CONFIG),
             'mode': 'retain-on-failure'  # 'on', 'off', 'retain-on-failure'
         }
         
@@ -39,7 +87,6 @@ class VideoHelper:
     def _check_ffmpeg_availability(self) -> bool:
         """检查ffmpeg是否可用"""
         try:
-            import subprocess
             result = subprocess.run(['ffmpeg', '-version'], 
                                   capture_output=True, 
                                   text=True, 
@@ -80,7 +127,7 @@ class VideoHelper:
                 config.update(video_config)
             
             # 生成视频文件名
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            timestamp = _timestamp()
             test_prefix = f"{test_name}_" if test_name else ""
             video_filename = f"{test_prefix}test_{timestamp}.webm"
             self.current_video_path = self.base_path / video_filename
@@ -173,26 +220,21 @@ class VideoHelper:
                 return None
             
             # 生成失败视频的新文件名
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            timestamp = _timestamp()
             failed_video_name = f"failed_{test_name}_{timestamp}.webm"
-            failed_video_path = self.base_path / failed_video_name
+            failed_video_path = os.path.join(self.base_path, failed_video_name)
             
-            # 关闭页面以确保视频文件完整
+            # 关闭页面后由 Playwright 等待视频写入完成再保存，无需轮询文件状态
             page.close()
+            page.video.save_as(failed_video_path)
+            page.video.delete()
             
-            # 移动视频文件
-            if Path(video_path).exists():
-                Path(video_path).rename(failed_video_path)
-                
-                desc = f"测试失败视频 - {test_name}"
-                if error_msg:
-                    desc += f" - {error_msg[:100]}"
-                
-                logger.info(f"🎥 {desc}: {failed_video_path}")
-                return str(failed_video_path)
-            else:
-                logger.warning(f"视频文件不存在: {video_path}")
-                return None
+            desc = f"测试失败视频 - {test_name}"
+            if error_msg:
+                desc += f" - {error_msg[:100]}"
+            
+            logger.info(f"🎥 {desc}: {failed_video_path}")
+            return failed_video_path
                 
         except Exception as e:
             logger.error(f"保存失败视频失败: {str(e)}")
@@ -209,19 +251,24 @@ class VideoHelper:
             删除的文件数量
         """
         try:
-            current_time = datetime.now()
+            # 直接比较时间戳：文件年龄满 days + 1 天（即按天取整后大于 days）才删除
+            cutoff = time.time() - (days + 1) * 86400
+            active_paths = {str(path) for path in self._active_videos}
             deleted_count = 0
             
-            for file_path in self.base_path.glob("*.webm"):
-                # 跳过正在录制的视频文件
-                if file_path in self._active_videos:
-                    continue
+            with os.scandir(self.base_path) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(".webm"):
+                        continue
                     
-                file_time = datetime.fromtimestamp(file_path.stat().st_mtime)
-                if (current_time - file_time).days > days:
-                    file_path.unlink()
-                    deleted_count += 1
-                    logger.debug(f"删除旧视频: {file_path}")
+                    # 跳过正在录制的视频文件
+                    if entry.path in active_paths:
+                        continue
+                    
+                    if entry.stat().st_mtime <= cutoff:
+                        os.unlink(entry.path)
+                        deleted_count += 1
+                        logger.debug(f"删除旧视频: {entry.path}")
             
             if deleted_count > 0:
                 logger.info(f"清理完成，删除了 {deleted_count} 个旧视频文件")
@@ -261,7 +308,13 @@ class VideoHelper:
             logger.error(f"获取视频信息失败: {str(e)}")
             return {}
     
-    def compress_video(self, input_path: str, output_path: str = None, quality: str = "medium") -> Optional[str]:
+    def compress_video(
+        self,
+        input_path: str,
+        output_path: str = None,
+        quality: str = "medium",
+        output_fp: Optional[BinaryIO] = None
+    ) -> Optional[Union[str, BinaryIO]]:
         """
         压缩视频文件 (需要 ffmpeg)
         
@@ -269,9 +322,12 @@ class VideoHelper:
             input_path: 输入视频路径
             output_path: 输出视频路径
             quality: 压缩质量 (low, medium, high)
+            output_fp: 输出文件对象，需具有文件描述符（如已打开的文件或套接字文件）；
+                提供时 ffmpeg 以 Matroska 格式直接写入该对象，不落盘，忽略 output_path
             
         Returns:
-            压缩后的视频路径
+            压缩后的视频路径；写入 output_fp 时返回该文件对象本身（不是路径）；
+            失败时返回None
         """
         try:
             # 检查ffmpeg是否可用
@@ -279,21 +335,24 @@ class VideoHelper:
                 logger.warning("FFmpeg 不可用，无法进行视频压缩")
                 return None
             
-            import subprocess
-            
             input_file = Path(input_path)
             if not input_file.exists():
                 logger.error(f"输入视频文件不存在: {input_path}")
                 return None
             
-            if not output_path:
-                output_path = str(input_file.parent / f"compressed_{input_file.name}")
+            if output_fp is not None:
+                # 通过管道输出，需显式指定可流式写入的容器格式
+                output_args = ['-f', 'matroska', 'pipe:1']
+            else:
+                if not output_path:
+                    output_path = str(input_file.parent / f"compressed_{input_file.name}")
+                output_args = [str(output_path)]
             
-            # 质量参数映射
+            # 质量参数映射（编码预设和CRF）：低质量使用最快的预设
             quality_params = {
-                'low': ['-crf', '28'],
-                'medium': ['-crf', '23'],
-                'high': ['-crf', '18']
+                'low': ['-preset', 'ultrafast', '-crf', '28'],
+                'medium': ['-preset', 'fast', '-crf', '23'],
+                'high': ['-preset', 'medium', '-crf', '18']
             }
             
             # 构建 ffmpeg 命令
@@ -301,18 +360,28 @@ class VideoHelper:
                 'ffmpeg',
                 '-i', str(input_path),
                 '-c:v', 'libx264',
-                '-preset', 'medium',
+                '-threads', '0',  # 由 libx264 自动使用全部CPU核心
                 *quality_params.get(quality, quality_params['medium']),
                 '-c:a', 'aac',
                 '-b:a', '128k',
                 '-y',  # 覆盖输出文件
-                str(output_path)
+                *output_args
             ]
             
             # 执行压缩
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+            result = subprocess.run(
+                cmd,
+                # 视频写入输出文件，stdout 无有用内容，仅捕获 stderr 用于错误日志
+                stdout=output_fp if output_fp is not None else subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True,
+                timeout=300
+            )
             
             if result.returncode == 0:
+                if output_fp is not None:
+                    logger.info("视频压缩完成，已写入输出文件对象")
+                    return output_fp
                 logger.info(f"视频压缩完成: {output_path}")
                 return str(output_path)
             else:
@@ -325,55 +394,28 @@ class VideoHelper:
         except Exception as e:
             logger.error(f"视频压缩失败: {str(e)}")
             return None
-
-
-class VideoRecordingContext:
-    """视频录制上下文管理器"""
     
-    def __init__(self, video_helper: VideoHelper, test_name: str = "", save_on_success: bool = False) -> None:
+    def compress_videos(self, input_paths: List[str], quality: str = "medium") -> List[Optional[str]]:
         """
-        初始化视频录制上下文
+        并行压缩多个视频文件 (需要 ffmpeg)
         
         Args:
-            video_helper: 视频助手实例
-            test_name: 测试名称
-            save_on_success: 成功时是否保存视频
+            input_paths: 输入视频路径列表
+            quality: 压缩质量 (low, medium, high)
+            
+        Returns:
+            与输入顺序一致的压缩后视频路径列表，压缩失败的项为 None
         """
-        self.video_helper: VideoHelper = video_helper
-        self.test_name: str = test_name
-        self.save_on_success: bool = save_on_success
-        self.video_path: Optional[str] = None
-        self.test_failed: bool = False
-    
-    def __enter__(self) -> 'VideoRecordingContext':
-        """进入上下文"""
-        self.video_helper.start_recording(self.test_name)
-        return self
-    
-    def __exit__(self, exc_type: Optional[type], exc_val: Optional[Exception], exc_tb: Optional[Any]) -> bool:
-        """退出上下文"""
-        # 判断是否有异常（测试失败）
-        self.test_failed = exc_type is not None
-        
-        # 根据测试结果决定是否保存视频
-        save_video = self.test_failed or self.save_on_success
-        self.video_path = self.video_helper.stop_recording(save_video)
-        
-        return False  # 不抑制异常
-
-
-def create_video_helper(context: BrowserContext, base_path: str = "reports/videos") -> VideoHelper:
-    """
-    创建视频助手实例
-    
-    Args:
-        context: Playwright 浏览器上下文
-        base_path: 视频保存基础路径
+        if not input_paths:
+            return []
         
-    Returns:
-        视频助手实例
-    """
-    return VideoHelper(context, base_path)
+        # 每个 ffmpeg 进程已使用多线程编码，并发数取CPU核心数的一半以避免过度争用
+        max_workers = max(1, min(len(input_paths), (os.cpu_count() or 2) // 2))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(
+                lambda input_path: self.compress_video(input_path, quality=quality),
+                input_paths
+            ))
     
     def cleanup_resources(self) -> None:
         """
@@ -422,4 +464,53 @@ def create_video_helper(context: BrowserContext, base_path: str = "reports/video
             
         except Exception as e:
             logger.error(f"强制清理视频文件失败: {str(e)}")
-            return False
\ No newline at end of file
+            return False
+
+
+class VideoRecordingContext:
+    """视频录制上下文管理器"""
+    
+    def __init__(self, video_helper: VideoHelper, test_name: str = "", save_on_success: bool = False) -> None:
+        """
+        初始化视频录制上下文
+        
+        Args:
+            video_helper: 视频助手实例
+            test_name: 测试名称
+            save_on_success: 成功时是否保存视频
+        """
+        self.video_helper: VideoHelper = video_helper
+        self.test_name: str = test_name
+        self.save_on_success: bool = save_on_success
+        self.video_path: Optional[str] = None
+        self.test_failed: bool = False
+    
+    def __enter__(self) -> 'VideoRecordingContext':
+        """进入上下文"""
+        self.video_helper.start_recording(self.test_name)
+        return self
+    
+    def __exit__(self, exc_type: Optional[type], exc_val: Optional[Exception], exc_tb: Optional[Any]) -> bool:
+        """退出上下文"""
+        # 判断是否有异常（测试失败）
+        self.test_failed = exc_type is not None
+        
+        # 根据测试结果决定是否保存视频
+        save_video = self.test_failed or self.save_on_success
+        self.video_path = self.video_helper.stop_recording(save_video)
+        
+        return False  # 不抑制异常
+
+
+def create_video_helper(context: BrowserContext, base_path: str = "reports/videos") -> VideoHelper:
+    """
+    创建视频助手实例
+    
+    Args:
+        context: Playwright 浏览器上下文
+        base_path: 视频保存基础路径
+        
+    Returns:
+        视频助手实例
+    """
+    return VideoHelper(context, base_path)